@@ -36,15 +36,101 @@ please check the `teleconf.examples` module
 
 Copyright (c) 2025 NeoLine
 """
+import functools
 import json
+import os
 import re
 import sys
+import tempfile
 from pathlib import Path
-from typing import TypedDict
+from typing import TYPE_CHECKING, Any, Callable, TypedDict
 
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.validation import Validator
+if TYPE_CHECKING:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.validation import Validator
+
+# orjson is only used for reading, writing always goes through the stdlib
+# so the file layout doesn't depend on which backend is installed
+try:
+    from orjson import loads as _loads
+except ImportError:
+    from json import loads as _loads
+
+
+def _dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=4).encode("utf-8")
+
+
+_PHONE_RE = re.compile(r"^\+?[1-9][0-9]{6,14}$")
+
+
+@functools.lru_cache(maxsize=32)
+def _resolve_paths(config_file: str, cwd: str) -> tuple[Path, Path]:
+    # The working directory is part of the key so relative paths are never resolved against a stale one
+    config_path = Path(cwd, config_file)
+    return config_path, config_path.with_name(f".{config_path.name}.history")
+
+
+def _is_api_id(text: str) -> bool:
+    # Only ASCII digits, unlike str.isdigit() which accepts any Unicode digit.
+    # API IDs are 32-bit, so anything longer than 10 digits is rejected before it reaches int()
+    return text.isascii() and text.isdecimal() and len(text) <= 10
+
+
+def _is_not_empty(text: str) -> bool:
+    return bool(text.strip())
+
+
+def _is_phone_number(text: str) -> bool:
+    return _PHONE_RE.match(text.strip()) is not None
+
+
+_TIP_APILINK = "\nTip: To obtain your API ID and API Hash, log in to your Telegram account at: https://my.telegram.org/auth?to=apps"
+
+# Field name -> (prompt text, tip printed before prompting, input predicate, validation error message, input postprocessor)
+_FIELD_SPECS: dict[str, tuple[str, str | None, Callable[[str], bool], str, Callable[[str], Any]]] = {
+    "api_id": (
+        "➤ Enter the Telegram API ID of your application: ",
+        _TIP_APILINK,
+        _is_api_id,
+        "Enter a numeric API ID",
+        int,
+    ),
+    "api_hash": (
+        "➤ Enter the Telegram API Hash of your application: ",
+        _TIP_APILINK,
+        _is_not_empty,
+        "API Hash cannot be empty",
+        str.strip,
+    ),
+    "bot_token": (
+        "\n➤ Enter your bot token obtained from BotFather: ",
+        None,
+        _is_not_empty,
+        "Bot Token cannot be empty",
+        str.strip,
+    ),
+    "phone_number": (
+        "\n➤ Enter your phone number: ",
+        None,
+        _is_phone_number,
+        "Phone number should contain only digits, optionally starting with a +, and be 7–15 digits long.",
+        str.strip,
+    ),
+}
+
+
+# Validators are stateless, so they are built once on first use and shared between instances
+@functools.cache
+def _validator(key: str) -> "Validator":
+    from prompt_toolkit.validation import Validator
+
+    _, _, predicate, error_message, _ = _FIELD_SPECS[key]
+    return Validator.from_callable(
+        predicate,
+        error_message=error_message,
+        move_cursor_to_end=True,
+    )
 
 
 class ConfigDict(TypedDict):
@@ -122,117 +208,99 @@ class Config:
             )
             ```
         """
-        # Prepare prompt session with persistent history
-        self.config_file = Path(config_file).absolute()
-        self.history_file = self.config_file.with_name(f".{self.config_file.name}.history")
+        self.config_file, self.history_file = _resolve_paths(str(config_file), os.getcwd())
 
-        self.session = PromptSession(history=FileHistory(str(self.history_file)))
+        self._session: "PromptSession[str] | None" = None
         self.as_dict: ConfigDict = {} # pyright: ignore[reportAttributeAccessIssue]
 
         # Load existing config if available
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    self.as_dict = json.load(f)
-            except json.JSONDecodeError:
-                self.as_dict = {} # pyright: ignore[reportAttributeAccessIssue]
-
-        # Prompt for missing values
         try:
-            # API ID (must be integer)
-            if request_api_id:
-                self.api_id = self._get_api_id(force_update)
+            self.as_dict = _loads(self.config_file.read_bytes())
+        except (json.JSONDecodeError, FileNotFoundError):
+            self.as_dict = {} # pyright: ignore[reportAttributeAccessIssue]
+
+        fields = (
+            ("api_id",       request_api_id),
+            ("api_hash",     request_api_hash),
+            ("bot_token",    request_bot_token),
+            ("phone_number", request_phone_number),
+        )
+        requested_keys = [key for key, requested in fields if requested]
 
-            # API Hash
-            if request_api_hash:
-                self.api_hash = self._get_api_hash(force_update)
+        # Everything is already configured, so there's nothing to prompt for or save
+        if not force_update and all(key in self.as_dict for key in requested_keys):
+            for key in requested_keys:
+                setattr(self, key, self.as_dict[key])
+            return
 
-            # Bot token
-            if request_bot_token:
-                self.bot_token = self._get_bot_token(force_update)
+        loaded = dict(self.as_dict)
 
-            # Phone number
-            if request_phone_number:
-                self.phone_number = self._get_phone_number(force_update)
+        # Prompt for missing values
+        try:
+            for key in requested_keys:
+                if force_update or key not in self.as_dict:
+                    setattr(self, key, self._prompt_field(key))
+                else:
+                    setattr(self, key, self.as_dict[key])
 
         # Exit on CTRL+C
         except KeyboardInterrupt:
             print("\n\nInput canceled by user")
             sys.exit(0)
 
-        # Save config
+        # Save config, keeping values that weren't requested this time
         self.as_dict = { # pyright: ignore[reportAttributeAccessIssue]
-            "api_id":    self.api_id,
-            "api_hash":  self.api_hash,
-            "bot_token": self.bot_token,
+            **loaded,
+            **{key: getattr(self, key) for key in requested_keys},
         }
-        with self.config_file.open("w", encoding="utf-8") as f:
-            json.dump(self.as_dict, f, ensure_ascii=False, indent=4)
-
-    def _get_api_id(self, force_update: bool) -> int:
-        if ("api_id" in self.as_dict) and not force_update:
-            return self.as_dict["api_id"]
-
-        print("\nTip: To obtain your API ID and API Hash, log in to your Telegram account at: https://my.telegram.org/auth?to=apps")
-        api_id_text: str = self.session.prompt(
-            "➤ Enter the Telegram API ID of your application: ",
-            validator=Validator.from_callable(
-                lambda t: t.isdigit(),
-                error_message="Enter a numeric API ID",
-                move_cursor_to_end=True,
-            ),
-            validate_while_typing=False
-        )
-        return int(api_id_text.strip())
-
-
-    def _get_api_hash(self, force_update: bool) -> str:
-        if ("api_hash" in self.as_dict) and not force_update:
-            return self.as_dict["api_hash"]
-
-        print("\nTip: To obtain your API ID and API Hash, log in to your Telegram account at: https://my.telegram.org/auth?to=apps")
-        api_hash_text: str = self.session.prompt(
-            "➤ Enter the Telegram API Hash of your application: ",
-            validator=Validator.from_callable(
-                lambda t: bool(t.strip()),
-                error_message="API Hash cannot be empty",
-                move_cursor_to_end=True,
-            ),
-            validate_while_typing=False
-        )
-        return api_hash_text.strip()
-
-
-    def _get_bot_token(self, force_update: bool) -> str:
-        if ("bot_token" in self.as_dict) and not force_update:
-            return self.as_dict["bot_token"]
-
-        bot_token_text: str = self.session.prompt(
-            "\n➤ Enter your bot token obtained from BotFather: ",
-            validator=Validator.from_callable(
-                lambda t: bool(t.strip()),
-                error_message="Bot Token cannot be empty",
-                move_cursor_to_end=True,
-            ),
-            validate_while_typing=False
-        )
-        return bot_token_text.strip()
-
-
-    def _get_phone_number(self, force_update: bool) -> str:
-        if ("phone_number" in self.as_dict) and not force_update:
-            return self.as_dict["phone_number"]
+        if self.as_dict != loaded:
+            # Write to a temporary file first so an interrupted write can't corrupt the config
+            # and keep the original file's permissions, since it holds credentials.
+            # Symlinks are resolved so the link's target gets updated instead of the link being replaced
+            target = Path(os.path.realpath(self.config_file))
+            try:
+                mode = target.stat().st_mode & 0o777
+            except FileNotFoundError:
+                mode = 0o600
 
-        phone_number_text: str = self.session.prompt(
-            "\n➤ Enter your phone number: ",
-            validator=Validator.from_callable(
-                lambda t: bool(re.match(r"^\+?[1-9]\d{6,14}$", t.strip())),
-                error_message="Phone number should contain only digits, optionally starting with a +, and be 7–15 digits long.",
-                move_cursor_to_end=True,
-            ),
+            # mkstemp creates a uniquely named file with mode 0600, so concurrent saves can't clobber each other
+            fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(_dumps(self.as_dict))
+                os.chmod(tmp_name, mode)
+                os.replace(tmp_name, target)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+
+    @property
+    def session(self) -> "PromptSession[str]":
+        """Prompt session with persistent history, created on first access."""
+        return self._get_session()
+
+    def _get_session(self) -> "PromptSession[str]":
+        # Prepare prompt session with persistent history on first use,
+        # prompt_toolkit is heavy to import so it's only loaded when needed
+        if self._session is None:
+            from prompt_toolkit import PromptSession
+            from prompt_toolkit.history import FileHistory
+
+            self._session = PromptSession(history=FileHistory(str(self.history_file)))
+
+        return self._session
+
+    def _prompt_field(self, key: str) -> Any:
+        text, tip, _, _, postprocess = _FIELD_SPECS[key]
+        if tip:
+            print(tip)
+
+        value: str = self._get_session().prompt(
+            text,
+            validator=_validator(key),
             validate_while_typing=False
         )
-        return phone_number_text.strip()
+        return postprocess(value)
 
 
 __all__ = ["Config"]